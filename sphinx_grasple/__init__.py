@@ -11,7 +11,7 @@ see AUTHORS in the original project (Copyright 2020-2021 by Executable Books).
 """
 
 from pathlib import Path
-from typing import Any, Dict, Set, Union, cast
+from typing import Any, Dict, List, Set, Union, cast
 from sphinx.config import Config
 from sphinx.application import Sphinx
 from sphinx.environment import BuildEnvironment
@@ -40,6 +40,8 @@ from .nodes import (
     depart_exercise_latex_number_reference,
 )
 
+from .utils import findall
+
 from .post_transforms import (
     ResolveTitlesInGraspleExercises,
     UpdateReferencesToGraspleEnumerated,
@@ -51,6 +53,15 @@ logger = logging.getLogger(__name__)
 # Callback Functions
 
 
+def init_grasple_exercises(
+    app: Sphinx, env: BuildEnvironment, docnames: List[str]
+) -> None:
+    """Initialise sphinx_grasple_exercise registry"""
+
+    if not hasattr(env, "sphinx_grasple_exercise_registry"):
+        env.sphinx_grasple_exercise_registry = {}
+
+
 def purge_grasple_exercises(app: Sphinx, env: BuildEnvironment, docname: str) -> None:
     """Purge sphinx_grasple_exercise registry"""
 
@@ -74,14 +85,13 @@ def merge_exercises(
     """Merge sphinx_grasple_exercise_registry"""
 
     if not hasattr(env, "sphinx_grasple_exercise_registry"):
-        env.sphinx_exercise_registry = {}
+        env.sphinx_grasple_exercise_registry = {}
 
     # Merge env stored data
     if hasattr(other, "sphinx_grasple_exercise_registry"):
-        env.sphinx_exercise_registry = {
-            **env.sphinx_grasple_exercise_registry,
-            **other.sphinx_grasple_exercise_registry,
-        }
+        env.sphinx_grasple_exercise_registry.update(
+            other.sphinx_grasple_exercise_registry
+        )
 
 
 def init_numfig(app: Sphinx, config: Config) -> None:
@@ -115,7 +125,7 @@ def doctree_read(app: Sphinx, document: Node) -> None:
     domain = cast(StandardDomain, app.env.get_domain("std"))
 
     # Traverse sphinx-exercise nodes
-    for node in document.traverse():
+    for node in findall(document):
         if is_extension_node(node):
             name = node.get("names", [])[0]
             label = document.nameids[name]
@@ -128,6 +138,7 @@ def doctree_read(app: Sphinx, document: Node) -> None:
 def setup(app: Sphinx) -> Dict[str, Any]:
 
     app.connect("config-inited", init_numfig)  # event order - 1
+    app.connect("env-before-read-docs", init_grasple_exercises)  # event order - 4
     app.connect("env-purge-doc", purge_grasple_exercises)  # event order - 5 per file
     app.connect("doctree-read", doctree_read)  # event order - 8
     app.connect("env-merge-info", merge_exercises)  # event order - 9
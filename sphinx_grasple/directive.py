@@ -21,7 +21,8 @@ from .nodes import (
     grasple_exercise_node,
     grasple_exercise_enumerable_node,
     grasple_exercise_title,
-    grasple_exercise_subtitle
+    grasple_exercise_subtitle,
+    DEFAULT_TITLE,
 )
 from docutils import nodes
 from sphinx.util import logging
@@ -36,12 +37,11 @@ class SphinxGraspleExerciseBaseDirective(SphinxDirective):
     def duplicate_labels(self, label):
         """Check for duplicate labels"""
 
-        if not label == "" and label in self.env.sphinx_grasple_exercise_registry.keys():
+        registry = self.env.sphinx_grasple_exercise_registry
+        if label and label in registry:
             docpath = self.env.doc2path(self.env.docname)
             path = docpath[: docpath.rfind(".")]
-            other_path = self.env.doc2path(
-                self.env.sphinx_grasple_exercise_registry[label]["docname"]
-            )
+            other_path = self.env.doc2path(registry[label]["docname"])
             msg = f"duplicate label: {label}; other instance in {other_path}"
             logger.warning(msg, location=path, color="red")
             return True
@@ -81,6 +81,12 @@ class GraspleExerciseDirective(SphinxGraspleExerciseBaseDirective):
     """
 
     name = "grasple-exercise"
+    _DEFAULT_TITLE = DEFAULT_TITLE
+    _DEFAULT_IFRAME_W = "100%"
+    _DEFAULT_IFRAME_H = "400px"
+    _IFRAME_TPL = '<iframe src="{}" width="{}" height="{}"></iframe>'
+    _DETAILS_PREFIX = '<details class="dropdown"><summary>Show/Hide Content</summary>'
+    _DETAILS_SUFFIX = "</details>"
     has_content = False
     required_arguments = 0
     optional_arguments = 1
@@ -100,24 +106,33 @@ class GraspleExerciseDirective(SphinxGraspleExerciseBaseDirective):
 
     def run(self) -> List[Node]:
 
-        # Parse options
-        description = self.options.get('description', None)
-        url = self.options.get('url')
-        iframe_width = self.options.get('iframe_width', '100%')
-        iframe_height = self.options.get('iframe_height', '400px')
-        dropdown = 'dropdown' in self.options
-        qr = 'qr' in self.options
+        # Construct a label
+        label = self.options.get("label", "")
+        if label:
+            # TODO: Check how :noindex: is used here
+            self.options["noindex"] = False
+            # Check for Duplicate Labels
+            # TODO: Should we just issue a warning rather than skip content?
+            if self.duplicate_labels(label):
+                return []
+        elif "hidden" in self.options:
+            # A hidden exercise without a label cannot be referenced
+            return []
 
-        self.defaults = {"title_text": "Grasple Exercise"}
+        # Only exercises that are kept consume a serial number
         self.serial_number = self.env.new_serialno()
+        if not label:
+            self.options["noindex"] = True
+            label = f"{self.env.docname}-grasple-exercise-{self.serial_number}"
+            if self.duplicate_labels(label):
+                return []
 
-        # Initialise Registry (if needed)
-        if not hasattr(self.env, "sphinx_grasple_exercise_registry"):
-            self.env.sphinx_grasple_exercise_registry = {}
+        # Collect Classes
+        classes = [self.name]
+        if self.options.get("class"):
+            classes.extend(self.options.get("class"))
 
-        # Construct Title
-        title = grasple_exercise_title()
-        title += nodes.Text(self.defaults["title_text"])
+        self.options["name"] = label
 
         # Select Node Type and Initialise
         if "nonumber" in self.options:
@@ -125,13 +140,52 @@ class GraspleExerciseDirective(SphinxGraspleExerciseBaseDirective):
         else:
             node = grasple_exercise_enumerable_node()
 
+        # Register Node before parsing any content, so hidden exercises
+        # keep their label without paying for the parse
+        node.attributes.update(
+            {
+                "classes": node["classes"] + classes,
+                "ids": node["ids"] + [label],
+                "label": label,
+                "docname": self.env.docname,
+                "title": self._DEFAULT_TITLE,
+                "type": self.name,
+                "hidden": "hidden" in self.options,
+                "serial_number": self.serial_number,
+            }
+        )
+        node.document = self.state.document
+
+        self.add_name(node)
+        self.env.sphinx_grasple_exercise_registry[label] = {
+            "type": self.name,
+            "docname": self.env.docname,
+            "node": node,
+        }
+
+        # TODO: Could tag this as Hidden to prevent the cell showing
+        # rather than removing content
+        # https://github.com/executablebooks/sphinx-jupyterbook-latex/blob/8401a27417d8c2dadf0365635bd79d89fdb86550/sphinx_jupyterbook_latex/transforms.py#L108
+        if node["hidden"]:
+            return []
+
+        # Parse options
+        description = self.options.get('description', None)
+        url = self.options.get('url')
+        iframe_width = self.options.get('iframe_width') or self._DEFAULT_IFRAME_W
+        iframe_height = self.options.get('iframe_height') or self._DEFAULT_IFRAME_H
+        dropdown = 'dropdown' in self.options
+        qr = 'qr' in self.options
+
+        # Construct Title
+        title = grasple_exercise_title()
+        title += nodes.Text(self._DEFAULT_TITLE)
+
         # Parse custom subtitle option
-        if self.arguments != []:
+        if self.arguments and self.arguments[0].strip():
             subtitle = grasple_exercise_subtitle()
-            subtitle_text = f"{self.arguments[0]}"
-            subtitle_nodes, _ = self.state.inline_text(subtitle_text, self.lineno)
-            for subtitle_node in subtitle_nodes:
-                subtitle += subtitle_node
+            subtitle_nodes, _ = self.state.inline_text(self.arguments[0], self.lineno)
+            subtitle.extend(subtitle_nodes)
             title += subtitle
 
         # State Parsing
@@ -159,73 +213,19 @@ class GraspleExerciseDirective(SphinxGraspleExerciseBaseDirective):
         section += side_by_side
 
         # Create the iframe HTML code
-        iframe_html = f'<iframe src="{url}" width="{iframe_width}" height="{iframe_height}"></iframe>'
-        iframe_node = nodes.raw('', iframe_html, format='html')
+        iframe_html = self._IFRAME_TPL.format(url, iframe_width, iframe_height)
 
         if dropdown:
-            # Wrap the iframe in a dropdown container if the dropdown option is specified
-            dropdown_content = nodes.container(classes=['dropdown-content'])
-            dropdown_content += iframe_node
-
-            # Wrap the dropdown content in a container with CSS classes for styling
-            container_node = nodes.container(classes=['dropdown-container'])
-            container_node += dropdown_content
-
-            # Create the details element with the summary and container
-            details_html = '<details class="dropdown"><summary>Show/Hide Content</summary>{}</details>'.format(container_node.astext())
-            details_node = nodes.raw('', details_html, format='html')
-
-            # Add the details element to the exercise node
-            section += details_node
+            # Wrap the iframe in a details element with a summary if the
+            # dropdown option is specified
+            details_html = self._DETAILS_PREFIX + iframe_html + self._DETAILS_SUFFIX
+            section += nodes.raw('', details_html, format='html')
         else:
             # Add the iframe directly to the exercise node
-            section += iframe_node
-
-        # Construct a label
-        label = self.options.get("label", "")
-        if label:
-            # TODO: Check how :noindex: is used here
-            self.options["noindex"] = False
-        else:
-            self.options["noindex"] = True
-            label = f"{self.env.docname}-grasple-exercise-{self.serial_number}"
-
-        # Check for Duplicate Labels
-        # TODO: Should we just issue a warning rather than skip content?
-        if self.duplicate_labels(label):
-            return []
-
-        # Collect Classes
-        classes = [f"{self.name}"]
-        if self.options.get("class"):
-            classes.extend(self.options.get("class"))
-
-        self.options["name"] = label
+            section += nodes.raw('', iframe_html, format='html')
 
         # Construct Node
         node += title
         node += section
-        node["classes"].extend(classes)
-        node["ids"].append(label)
-        node["label"] = label
-        node["docname"] = self.env.docname
-        node["title"] = self.defaults["title_text"]
-        node["type"] = self.name
-        node["hidden"] = True if "hidden" in self.options else False
-        node["serial_number"] = self.serial_number
-        node.document = self.state.document
-
-        self.add_name(node)
-        self.env.sphinx_grasple_exercise_registry[label] = {
-            "type": self.name,
-            "docname": self.env.docname,
-            "node": node,
-        }
-
-        # TODO: Could tag this as Hidden to prevent the cell showing
-        # rather than removing content
-        # https://github.com/executablebooks/sphinx-jupyterbook-latex/blob/8401a27417d8c2dadf0365635bd79d89fdb86550/sphinx_jupyterbook_latex/transforms.py#L108
-        if node.get("hidden", bool):
-            return []
 
-        return [node]
\ No newline at end of file
+        return [node]
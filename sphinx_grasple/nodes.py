@@ -18,6 +18,9 @@ from .latex import LaTeXMarkup
 logger = logging.getLogger(__name__)
 LaTeX = LaTeXMarkup()
 
+DEFAULT_TITLE = "Grasple Exercise"
+DEFAULT_TITLES = (DEFAULT_TITLE, f"{DEFAULT_TITLE} %s")
+
 
 # Nodes
 
@@ -37,11 +40,7 @@ class grasple_exercise_end_node(docutil_nodes.Admonition, docutil_nodes.Element)
 
 class grasple_exercise_title(docutil_nodes.title):
     def default_title(self):
-        title_text = self.children[0].astext()
-        if title_text == "Grasple Exercise" or title_text == "Grasple Exercise %s":
-            return True
-        else:
-            return False
+        return self.children[0].astext() in DEFAULT_TITLES
 
 
 class grasple_exercise_subtitle(docutil_nodes.subtitle):
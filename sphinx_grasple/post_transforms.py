@@ -61,7 +61,7 @@ class UpdateReferencesToGraspleEnumerated(SphinxPostTransform):
                         node["reftype"] = "numref"
                         # Get Metadata from Inline
                         inline = node.children[0]
-                        classes = inline["classes"]
+                        classes = inline["classes"].copy()
                         classes.remove("std-ref")
                         classes.append("std-numref")
                         # Construct a Literal Node
@@ -1,16 +1,11 @@
-import re
-import docutils
-
 from sphinx.transforms import SphinxTransform
 from sphinx.util import logging
 from sphinx.errors import ExtensionError
 
-# from sphinx.errors import ExtensionError
-
+from .utils import findall
 from .nodes import (
-    grasple_exercise_node,
-    grasple_exercise_enumerable_node,
-    grasple_exercise_end_node
+    grasple_exercise_end_node,
+    is_exercise_node,
 )
 
 logger = logging.getLogger(__name__)
@@ -31,23 +26,22 @@ class CheckGatedDirectives(SphinxTransform):
         if docname in registry:
             start = registry[docname]["start"]
             end = registry[docname]["end"]
-            sequence = "".join(registry[docname]["sequence"])
-            structure = "\n  ".join(registry[docname]["msg"])
             nodetype = registry[docname]["type"]
+            issue = None
             if len(start) > len(end):
-                msg = f"The document ({docname}) is missing a {nodetype}-end directive\n  {structure}"  # noqa: E501
-                logger.error(msg)
-                error = True
-            if len(start) < len(end):
-                msg = f"The document ({docname}) is missing a {nodetype}-start directive\n  {structure}"  # noqa: E501
+                issue = f"is missing a {nodetype}-end directive"
+            elif len(start) < len(end):
+                issue = f"is missing a {nodetype}-start directive"
+            else:
+                sequence = "".join(registry[docname]["sequence"])
+                if sequence.count("SE") != len(start):
+                    issue = f"contains nested {nodetype}-start and {nodetype}-end directives"  # noqa: E501
+            if issue:
+                # Only build the structure listing when there is an error to report
+                structure = "\n  ".join(registry[docname]["msg"])
+                msg = f"The document ({docname}) {issue}\n  {structure}"
                 logger.error(msg)
                 error = True
-            if len(start) == len(end):
-                groups = re.findall("(SE)", sequence)
-                if len(groups) != len(start):
-                    msg = f"The document ({docname}) contains nested {nodetype}-start and {nodetype}-end directives\n  {structure}"  # noqa: E501
-                    logger.error(msg)
-                    error = True
         if error:
             msg = "[sphinx-grasple] An error has occured when parsing gated directives.\nPlease check warning messages above"  # noqa: E501
             raise ExtensionError(message=msg)
@@ -70,49 +64,45 @@ class MergeGatedExercises(SphinxTransform):
 
     default_priority = 10
 
-    def find_nodes(self, label, node):
-        parent_node = node.parent
-        parent_start, parent_end = None, None
-        for idx1, child in enumerate(parent_node.children):
-            if isinstance(
-                child, (grasple_exercise_node, grasple_exercise_enumerable_node)
-            ) and label == child.get("label"):
-                parent_start = idx1
-                for idx2, child2 in enumerate(parent_node.children[parent_start:]):
-                    if isinstance(child2, grasple_exercise_end_node):
-                        parent_end = idx1 + idx2
-                        break
-                break
-        return parent_start, parent_end
-
-    def merge_nodes(self, node):
-        label = node.get("label")
-        parent_start, parent_end = self.find_nodes(label, node)
-        if not parent_end:
-            return
-        parent = node.parent
-        # Use Current Node and remove "-start" from class names and type
-        updated_classes = [
-            cls.replace("-start", "") for cls in node.attributes["classes"]
-        ]
-        node.attributes["classes"] = updated_classes
-        node.attributes["type"] = node.attributes["type"].replace("-start", "")
-        # Attach content to section
-        content = node.children[-1]
-        for child in parent.children[parent_start + 1 : parent_end]:
-            content += child
-        # Clean up Parent Node including :exercise-end:
-        for child in parent.children[parent_start + 1 : parent_end + 1]:
-            parent.remove(child)
+    def merge_nodes(self, parent):
+        """Merge all gated exercises in parent with the content up to their end node"""
+        # Single pass over the children, pairing each gated exercise with the
+        # next end node (CheckGatedDirectives rules out nesting)
+        pairs = []
+        parent_start = None
+        for idx, child in enumerate(parent.children):
+            if is_exercise_node(child) and child.gated:
+                parent_start = idx
+                child.gated = False
+            elif (
+                isinstance(child, grasple_exercise_end_node)
+                and parent_start is not None
+            ):
+                pairs.append((parent_start, idx))
+                parent_start = None
+        # Work backwards so that the indices of earlier pairs remain valid
+        for parent_start, parent_end in reversed(pairs):
+            node = parent.children[parent_start]
+            # Use Current Node and remove "-start" from class names and type
+            updated_classes = [
+                cls.replace("-start", "") for cls in node.attributes["classes"]
+            ]
+            node.attributes["classes"] = updated_classes
+            node.attributes["type"] = node.attributes["type"].replace("-start", "")
+            moved = parent.children[parent_start + 1 : parent_end]
+            end_node = parent.children[parent_end]
+            # Clean up Parent Node including :exercise-end:
+            del parent.children[parent_start + 1 : parent_end + 1]
+            end_node.parent = None
+            # Attach content to section
+            node.children[-1].extend(moved)
 
     def apply(self):
-        # Process all matching exercise and exercise-enumerable (gated=True)
-        # and exercise-end nodes
-        for node in self.document.traverse(grasple_exercise_node):
-            if node.gated:
-                self.merge_nodes(node)
-            node.gated = False
-        for node in self.document.traverse(grasple_exercise_enumerable_node):
+        # Collect the parents of all gated exercise and exercise-enumerable
+        # nodes so that each parent's children are only scanned once
+        parents = {}
+        for node in findall(self.document, is_exercise_node):
             if node.gated:
-                self.merge_nodes(node)
-            node.gated = False
+                parents[id(node.parent)] = node.parent
+        for parent in parents.values():
+            self.merge_nodes(parent)
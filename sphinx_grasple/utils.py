@@ -31,3 +31,15 @@ def get_node_number(self, node, typ) -> str:
     fignumbers = self.builder.env.toc_fignumbers.get(docname, {})
     number = fignumbers.get(typ, {}).get(ids, ())
     return ".".join(map(str, number))
+
+
+def findall(node, condition=None):
+    """Iterate over node and its descendants that match condition.
+
+    Uses the Node.findall generator (docutils>=0.18) and falls back to
+    Node.traverse on older docutils releases.
+    """
+
+    if hasattr(node, "findall"):
+        return node.findall(condition)
+    return node.traverse(condition)